@@ -2,54 +2,61 @@ import argparse
 from pptx import Presentation
 from pptx.enum.shapes import MSO_SHAPE_TYPE
 from pptx.enum.dml import MSO_FILL
+import mmap
 import os
-from PIL import Image
 import logging
 from tqdm import tqdm
-import multiprocessing
-from functools import partial
-from io import BytesIO
-import json
-import base64
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# The per-slide rendering loops live in pptx_render so they can optionally
+# be compiled with mypyc (see that module's docstring)
+from pptx_render import process_slide, rgb_to_hex
+
+# python-pptx enum members resolve through descriptor machinery; bind the
+# ones hit per shape once at module scope
+_SOLID = MSO_FILL.SOLID
+_BACKGROUND = MSO_FILL.BACKGROUND
+_PICTURE = MSO_SHAPE_TYPE.PICTURE
 
 def get_fill_color(shape):
-    if hasattr(shape, 'fill'):
-        fill = shape.fill
-        if fill.type == MSO_FILL.SOLID:
-            if fill.fore_color.rgb:
-                return rgb_to_hex(fill.fore_color.rgb)
-        elif fill.type == MSO_FILL.BACKGROUND:
+    fill = getattr(shape, 'fill', None)
+    if fill is not None:
+        fill_type = fill.type
+        if fill_type == _SOLID:
+            rgb = fill.fore_color.rgb
+            if rgb:
+                return rgb_to_hex(rgb)
+        elif fill_type == _BACKGROUND:
             return 'transparent'
     return None
 
 def extract_slide_data(slide):
-    return [
-        {
-            'shape_type': shape.shape_type,
+    # Cache each @property once per shape; python-pptx re-parses XML on
+    # every access, so the old comprehension paid for several twice
+    slide_data = []
+    for shape in slide.shapes:
+        shape_type = shape.shape_type
+        has_text_frame = shape.has_text_frame
+        image = shape.image if shape_type == _PICTURE else None
+        slide_data.append({
+            'shape_type': shape_type,
             'left': shape.left,
             'top': shape.top,
             'width': shape.width,
             'height': shape.height,
-            'has_text_frame': shape.has_text_frame,
-            'text_frame': extract_text_frame(shape.text_frame) if shape.has_text_frame else None,
-            'image': base64.b64encode(shape.image.blob).decode('utf-8') if shape.shape_type == MSO_SHAPE_TYPE.PICTURE else None,
-            'image_format': shape.image.ext if shape.shape_type == MSO_SHAPE_TYPE.PICTURE else None,
+            'has_text_frame': has_text_frame,
+            'text_frame': extract_text_frame(shape.text_frame) if has_text_frame else None,
+            'image': image.blob if image is not None else None,
+            'image_format': image.ext if image is not None else None,
             'fill_color': get_fill_color(shape)
-        }
-        for shape in slide.shapes
-    ]
-
-def rgb_to_hex(rgb):
-    if rgb is None:
-        return None
-    return '#{:02x}{:02x}{:02x}'.format(*rgb)
+        })
+    return slide_data
 
 def extract_text_frame(text_frame):
-    def rgb_to_hex(rgb):
-        if rgb is None or not hasattr(rgb, 'rgb') or rgb.rgb is None:
+    def color_to_hex(color):
+        if color is None or not hasattr(color, 'rgb') or color.rgb is None:
             return None
-        # Convert the RGB tuple to hex
-        return '#{:02x}{:02x}{:02x}'.format(*rgb.rgb)
+        return rgb_to_hex(color.rgb)
 
     try:
         return [
@@ -63,7 +70,7 @@ def extract_text_frame(text_frame):
                         'font_size': run.font.size.pt if run.font.size else None,
                         'bold': run.font.bold,
                         'italic': run.font.italic,
-                        'color': rgb_to_hex(run.font.color),
+                        'color': color_to_hex(run.font.color),
                         'hyperlink': run.hyperlink.address if run.hyperlink else None
                     }
                     for run in paragraph.runs
@@ -75,69 +82,21 @@ def extract_text_frame(text_frame):
         logging.warning(f"Error extracting text frame: {str(e)}")
         return []
 
-def process_slide(slide_data_json, image_dir, slide_index, ignore_images=False):
-    slide_data = json.loads(slide_data_json)
-    return "".join([process_shape_data(shape_index, shape_data, image_dir, slide_index, ignore_images) 
-                    for shape_index, shape_data in enumerate(slide_data)])
-
-def process_shape_data(shape_index, shape_data, image_dir, slide_index, ignore_images=False):
-    # Calculate relative positions and sizes
-    left_percent = f"{(shape_data['left'] / 9144000) * 100:.2f}%"
-    top_percent = f"{(shape_data['top'] / 6858000) * 100:.2f}%"
-    width_percent = f"{(shape_data['width'] / 9144000) * 100:.2f}%"
-    height_percent = f"{(shape_data['height'] / 6858000) * 100:.2f}%"
-
-    common_style = f"left:{left_percent};top:{top_percent};width:{width_percent};height:{height_percent};"
-
-    if shape_data['shape_type'] == MSO_SHAPE_TYPE.PICTURE:
-        # Handle images
-        image_filename = f"slide_{slide_index + 1}_image_{shape_index + 1}.png"
-        
-        if not ignore_images:
-            image_bytes = base64.b64decode(shape_data['image'])
-            image_path = os.path.join(image_dir, image_filename)
-            
-            try:
-                with Image.open(BytesIO(image_bytes)) as img:
-                    img.save(image_path, "PNG")
-            except OSError as e:
-                logging.warning(f"Failed to process image on slide {slide_index + 1}, shape {shape_index + 1}: {str(e)}")
-                return f"<p>[Image processing failed for slide {slide_index + 1}, shape {shape_index + 1}]</p>"
-        
-        return f"<img src='images/{image_filename}' class='absolute object-contain' style='{common_style}'/>"
-    elif shape_data['has_text_frame']:
-        # Handle text with styling
-        text_content = ""
-        for paragraph in shape_data['text_frame']:
-            para_style = f"text-align: {paragraph['alignment']};"
-            para_content = ""
-            for run in paragraph['runs']:
-                run_style = f"font-family: {run['font_name']}; "
-                run_style += f"font-size: {run['font_size']}pt; " if run['font_size'] else ""
-                run_style += "font-weight: bold; " if run['bold'] else ""
-                run_style += "font-style: italic; " if run['italic'] else ""
-                run_style += f"color: {run['color']}; " if run['color'] else ""
-                
-                # Handle links
-                if run.get('hyperlink'):
-                    para_content += f"<a href='{run['hyperlink']}' style='{run_style}'>{run['text']}</a>"
-                else:
-                    para_content += f"<span style='{run_style}'>{run['text']}</span>"
-            
-            # Handle titles
-            if paragraph.get('is_title'):
-                text_content += f"<h1 class='title' style='{para_style}'>{para_content}</h1>"
-            else:
-                text_content += f"<p class='paragraph' style='{para_style}'>{para_content}</p>"
-        
-        # Handle background color
-        bg_color = f"background-color: {shape_data.get('fill_color', 'transparent')};"
-        return f"<div class='absolute flex flex-col items-start justify-start' style='{common_style}{bg_color}'>{text_content}</div>"
-    return ""
+class _SeekableMmap(mmap.mmap):
+    """Read-only mmap with the seekable() method zipfile expects."""
+
+    def seekable(self):
+        return True
+
 
 def pptx_to_html(pptx_file, output_file, ignore_images=False):
     logging.info(f"Opening PowerPoint file: {pptx_file}")
-    prs = Presentation(pptx_file)
+    # Serve zip reads from the page cache instead of buffered read() calls;
+    # python-pptx loads all parts during Presentation(), so the mapping can
+    # be dropped as soon as it returns
+    with open(pptx_file, 'rb') as f:
+        with _SeekableMmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            prs = Presentation(mm)
 
     output_dir = os.path.dirname(output_file)
     image_dir = os.path.join(output_dir, "images")
@@ -166,17 +125,25 @@ def pptx_to_html(pptx_file, output_file, ignore_images=False):
     """
 
     logging.info("Extracting slide data...")
-    slide_data_list = [extract_slide_data(slide) for slide in prs.slides]
+    # Slide objects aren't picklable, but extraction is lxml parsing in C,
+    # so threads overlap it across slides; map preserves slide order
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        slide_data_list = list(executor.map(extract_slide_data, prs.slides))
 
     logging.info("Processing slides...")
-    with multiprocessing.Pool() as pool:
+    # PIL's decode/encode calls release the GIL, so threads overlap the
+    # image work without paying to pickle every blob into a subprocess
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
         try:
-            slide_contents = list(tqdm(
-                pool.starmap(partial(process_slide, ignore_images=ignore_images), 
-                             [(json.dumps(data), image_dir, idx) for idx, data in enumerate(slide_data_list)]),
-                total=len(slide_data_list),
-                desc="Processing slides"
-            ))
+            # Collect results as each slide finishes rather than blocking on
+            # in-order delivery; the index keeps the final HTML in slide order
+            slide_contents = [None] * len(slide_data_list)
+            futures = {
+                executor.submit(process_slide, data, image_dir, idx, ignore_images=ignore_images): idx
+                for idx, data in enumerate(slide_data_list)
+            }
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Processing slides"):
+                slide_contents[futures[future]] = future.result()
         except Exception as e:
             logging.error(f"An error occurred during slide processing: {str(e)}")
             slide_contents = []